@@ -2,55 +2,69 @@
 import json
 import re
 
+def filter_record_lines(record_lines):
+    # Copy one record's lines, stopping at its closing brace. A bare '}'
+    # that ends the record is only kept when more lines follow in the
+    # record's slice (same rule the old buffered filter applied).
+    kept = []
+    last = len(record_lines) - 1
+    for idx, line in enumerate(record_lines):
+        stripped = line.strip()
+        if stripped and not stripped.startswith('}'):
+            kept.append(line)
+        elif stripped == '}' and idx < last:
+            kept.append(line)
+            break
+    return kept
+
 def extract_subset():
+    # Stream the file record by record instead of holding every input line
+    # and the assembled subset in memory at once. Only the first 10 records
+    # are kept (buffered one at a time until their closing boundary shows
+    # up); the rest of the file is just scanned to count records, so peak
+    # memory is bounded by the subset size rather than the full dataset.
+    record_count = 0
+    current_record = []
+    kept_chunks = []
+
     with open('public/data/synthetic-data3.json', 'r') as f:
-        content = f.read()
-    
-    # Find the start of each record
-    record_starts = []
-    lines = content.split('\n')
-    
-    for i, line in enumerate(lines):
-        if '"patient_supabase_id":' in line:
-            record_starts.append(i)
-    
-    print(f"Found {len(record_starts)} records")
-    
+        for line in f:
+            line = line.rstrip('\n')
+            if '"patient_supabase_id":' in line:
+                if 0 < record_count <= 10:
+                    kept_chunks.append(filter_record_lines(current_record))
+                current_record = []
+                record_count += 1
+            if 0 < record_count <= 10:
+                current_record.append(line)
+
+    # The 10th record runs to end-of-file when there is no 11th boundary.
+    if 0 < record_count <= 10 and current_record:
+        kept_chunks.append(filter_record_lines(current_record))
+
+    print(f"Found {record_count} records")
+
     # Extract first 10 complete records
-    if len(record_starts) >= 10:
-        # Find where the 10th record ends
-        start_line = 0
-        end_line = record_starts[10] if len(record_starts) > 10 else len(lines)
-        
+    if record_count >= 10:
         # Build the subset
         subset_lines = ['{\n  "synthetic_data": [']
-        
+
         # Add records 1-10
-        for i in range(10):
-            start = record_starts[i]
-            end = record_starts[i+1] if i+1 < len(record_starts) else len(lines)
-            
+        for i, chunk in enumerate(kept_chunks[:10]):
             if i > 0:
                 subset_lines.append('    },')
-            
-            # Add the record
-            for j in range(start, min(end, len(lines))):
-                if lines[j].strip() and not lines[j].strip().startswith('}'):
-                    subset_lines.append(lines[j])
-                elif lines[j].strip() == '}' and j < end - 1:
-                    subset_lines.append(lines[j])
-                    break
-        
+            subset_lines.extend(chunk)
+
         subset_lines.append('    }')
         subset_lines.append('  ]')
         subset_lines.append('}')
-        
+
         with open('public/data/synthetic-data3-subset.json', 'w') as f:
             f.write('\n'.join(subset_lines))
-        
+
         print("Created subset file")
     else:
         print("Not enough records found")
 
 if __name__ == "__main__":
-    extract_subset() 
\ No newline at end of file
+    extract_subset()
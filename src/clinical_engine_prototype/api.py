@@ -1,7 +1,21 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Any, Dict, List, Optional # Ensure List and Optional are imported
 
+try:
+    # Serialize responses with orjson when installed; the diagnostic package
+    # is a large nested structure and stdlib json is several times slower.
+    # Gate on the orjson import itself: fastapi exports ORJSONResponse
+    # unconditionally and only asserts orjson's presence at render time, so
+    # importing the response class never falls through to the fallback.
+    # (Newer fastapi deprecates ORJSONResponse in favor of byte serialization
+    # via response_model; the per-instantiation warning there is an accepted
+    # tradeoff until the prototype pins a version.)
+    import orjson  # noqa: F401 - consumed by ORJSONResponse at render time
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:  # pragma: no cover - orjson not installed
+    from fastapi.responses import JSONResponse as _DefaultResponse
+
 from .engine import (
     run_full_diagnostic,
     Patient, # Assuming Patient model is needed for request body or internal use
@@ -11,7 +25,7 @@ from .engine import (
     # For example, if the FHIR bundle directly maps to some Pydantic models in clinical_engine
 )
 
-app = FastAPI()
+app = FastAPI(default_response_class=_DefaultResponse)
 
 # Placeholder for FHIR Bundle model. 
 # For a real implementation, this would be a more complex Pydantic model 
@@ -35,32 +49,58 @@ class RunDxRequest(BaseModel):
     # fhir_bundle: FHIRBundle # Placeholder for future FHIR-based input
     target_encounter_id: Optional[str] = None # To associate with a specific encounter
 
+    @model_validator(mode="after")
+    def _check_patient_identity(self) -> "RunDxRequest":
+        # Consistency between patient_id and patient_data_dict.patient.id is
+        # enforced once at the request boundary instead of re-probed in the
+        # handler body. The bundle itself stays an opaque dict: the engine
+        # consumes it raw, so deep-validating it here would just duplicate
+        # work it deliberately skips.
+        patient = self.patient_data_dict.get("patient")
+        if not patient or not patient.get("id"):
+            if not self.patient_id:
+                raise ValueError("patient_data_dict must contain 'patient' with an 'id', or patient_id must be provided in request.")
+            self.patient_data_dict["patient"] = {"id": self.patient_id, **(patient or {})}
+        elif self.patient_id and patient.get("id") != self.patient_id:
+            raise ValueError(f"patient_id in request ({self.patient_id}) does not match patient.id in patient_data_dict ({patient.get('id')}).")
+        return self
+
 # Dummy clients for the clinical engine - replace with actual client initializations
+
+# Canned dummy payloads, built once at import instead of re-allocated per
+# query. Callers treat them as read-only; they are kept plain dicts/lists so
+# the responses stay JSON-serializable end to end.
+_DUMMY_PLAN_RESPONSE = {
+    "steps": [
+        {"id": "step1", "description": "Symptom Analysis", "query": "Analyze symptoms"},
+        {"id": "step2", "description": "Lab Review", "query": "Review lab results"}
+    ],
+    "rationale": "Based on symptoms, a two-step plan is proposed."
+}
+_DUMMY_DX_RESPONSE = {
+    "diagnosis_name": "Simulated Diagnosis",
+    "confidence": 0.85,
+    "supporting_evidence": ["Evidence A from context", "Evidence B from plan"],
+    "differential_diagnoses": [{"name": "Other Condition", "likelihood": "Low", "key_factors": "Key factor"}],
+    "recommended_tests": ["Test X", "Test Y"],
+    "recommended_treatments": ["Treatment Z"],
+}
+_DUMMY_LLM_ERROR = {"error": "Unknown prompt type for dummy LLM"}
+_DUMMY_GUIDELINE_RESULTS = [{"type": "guideline", "id": "guideline1", "title": "Relevant Guideline", "content": "Guideline detail..."}]
+
 class DummyLLMClient:
     async def query(self, prompt: str, context: Optional[str] = None) -> Dict[str, Any]:
-        # Simulate LLM response
-        if "diagnostic plan" in prompt.lower():
-            return {
-                "steps": [
-                    {"id": "step1", "description": "Symptom Analysis", "query": "Analyze symptoms"},
-                    {"id": "step2", "description": "Lab Review", "query": "Review lab results"}
-                ],
-                "rationale": "Based on symptoms, a two-step plan is proposed."
-            }
-        elif "synthesize diagnosis" in prompt.lower():
-            return {
-                "diagnosis_name": "Simulated Diagnosis",
-                "confidence": 0.85,
-                "supporting_evidence": ["Evidence A from context", "Evidence B from plan"],
-                "differential_diagnoses": [{"name": "Other Condition", "likelihood": "Low", "key_factors": "Key factor"}],
-                "recommended_tests": ["Test X", "Test Y"],
-                "recommended_treatments": ["Treatment Z"],
-            }
-        return {"error": "Unknown prompt type for dummy LLM"}
+        # Simulate LLM response; lowercase once and dispatch to the shared payloads.
+        prompt_lower = prompt.lower()
+        if "diagnostic plan" in prompt_lower:
+            return _DUMMY_PLAN_RESPONSE
+        elif "synthesize diagnosis" in prompt_lower:
+            return _DUMMY_DX_RESPONSE
+        return _DUMMY_LLM_ERROR
 
 class DummyGuidelineClient:
     async def search(self, query: str, patient_data: Optional[Dict[str, Any]] = None, max_results: int = 1) -> tuple[str, list]:
-        return f"Guideline content for {query}", [{"type": "guideline", "id": "guideline1", "title": "Relevant Guideline", "content": "Guideline detail..."}]
+        return f"Guideline content for {query}", _DUMMY_GUIDELINE_RESULTS
 
 class DummyClinicalTrialClient:
     async def search(self, diagnosis: str, patient_data: Optional[Dict[str, Any]] = None, max_results: int = 1) -> list:
@@ -81,15 +121,8 @@ async def run_dx_endpoint(request: RunDxRequest):
         if not (request.transcript and request.transcript.strip()) and not request.observations:
             raise HTTPException(status_code=400, detail="Either transcript or observations must be provided.")
 
-        # Ensure patient_data_dict contains 'patient' with an 'id'
-        if "patient" not in request.patient_data_dict or "id" not in request.patient_data_dict["patient"]:
-             if request.patient_id:
-                 request.patient_data_dict["patient"] = {"id": request.patient_id, **request.patient_data_dict.get("patient", {})}
-             else:
-                 raise HTTPException(status_code=400, detail="patient_data_dict must contain 'patient' with an 'id', or patient_id must be provided in request.")
-        elif request.patient_id and request.patient_data_dict["patient"].get("id") != request.patient_id:
-            raise HTTPException(status_code=400, detail=f"patient_id in request ({request.patient_id}) does not match patient.id in patient_data_dict ({request.patient_data_dict['patient'].get('id')}).")
-
+        # patient_id/patient_data_dict consistency is enforced by the
+        # RunDxRequest model validator before the handler runs.
         diagnostic_package = await run_full_diagnostic(
             patient_id=request.patient_id,
             transcript=request.transcript or "",
@@ -0,0 +1,117 @@
+"""
+Content-addressed response cache for the clinical engine prototype.
+
+Deterministic LLM-backed operations (plan generation, findings extraction)
+are pure functions of their inputs, so their responses can be cached under a
+digest of a canonical JSON encoding of those inputs plus a version tag.
+Repeat symptom clusters then skip the whole LLM round-trip — the dominant
+cost once the simulated calls are replaced with real ones.
+
+Like engine.py, this is prototype-only code: it is NOT wired into the live
+Next.js/Supabase application.
+
+The default backend is an in-process TTL-aware LRU. When the optional
+diskcache package is installed, entries are additionally persisted so the
+cache survives process restarts; disk I/O runs in the default executor to
+keep the event loop unblocked.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+try:
+    import diskcache  # optional: persistent cache across process restarts
+except ImportError:
+    diskcache = None
+
+CLINICAL_CACHE_SIZE = int(os.getenv("CLINICAL_CACHE_SIZE", "512"))
+CLINICAL_CACHE_TTL_SECONDS = float(os.getenv("CLINICAL_CACHE_TTL_SECONDS", str(24 * 3600)))
+CLINICAL_CACHE_DIR = os.getenv("CLINICAL_CACHE_DIR", "")
+
+
+def make_cache_key(*key_parts: Any) -> str:
+    """Digest the canonical JSON encoding of key_parts.
+
+    Key parts must be JSON-serializable; include a version tag (e.g.
+    "plan_v1") as the first part so a logic change invalidates old entries.
+    """
+    canonical = json.dumps(key_parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ClinicalCache:
+    """TTL-aware exact-match cache with an optional diskcache tier."""
+
+    def __init__(self, maxsize: int = CLINICAL_CACHE_SIZE,
+                 ttl: float = CLINICAL_CACHE_TTL_SECONDS,
+                 directory: str = CLINICAL_CACHE_DIR):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk = None
+        if diskcache is not None and directory:
+            self._disk = diskcache.Cache(directory)
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: Any, ttl: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl, value)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    async def get_or_compute(self, key_parts: Tuple[Any, ...],
+                             coro_factory: Callable[[], Awaitable[Any]],
+                             ttl: Optional[float] = None) -> Any:
+        """Return the cached value for key_parts, computing it on a miss.
+
+        coro_factory is only awaited on a miss; ttl overrides the cache
+        default for this entry.
+        """
+        key = make_cache_key(*key_parts)
+        effective_ttl = self.ttl if ttl is None else ttl
+
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+
+        if self._disk is not None:
+            loop = asyncio.get_running_loop()
+            value = await loop.run_in_executor(None, self._disk.get, key)
+            if value is not None:
+                self._set_memory(key, value, effective_ttl)
+                return value
+
+        value = await coro_factory()
+        self._set_memory(key, value, effective_ttl)
+        if self._disk is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, lambda: self._disk.set(key, value, expire=effective_ttl)
+            )
+        return value
+
+
+# Shared process-wide cache instance, mirroring the module-level singletons
+# used elsewhere in the prototype.
+clinical_cache = ClinicalCache()
+
+
+async def cached_llm(key_parts: Tuple[Any, ...],
+                     coro_factory: Callable[[], Awaitable[Any]],
+                     ttl: Optional[float] = None) -> Any:
+    """Convenience wrapper over the shared cache instance."""
+    return await clinical_cache.get_or_compute(key_parts, coro_factory, ttl=ttl)
@@ -0,0 +1,97 @@
+import pytest
+
+from src.clinical_engine_prototype.loaders import (
+    ADMISSIONS_FILE,
+    DIAGNOSES_FILE,
+    LABS_FILE,
+    PATIENTS_FILE,
+    PatientDataStore,
+    load_patient_data,
+)
+
+
+@pytest.fixture
+def sample_data_dir(tmp_path):
+    """Write a tiny copy of the four legacy sample tables (UTF-8 with BOM, tab-separated)."""
+    def write(name, header, rows):
+        lines = [header] + rows
+        (tmp_path / name).write_text("\n".join(lines) + "\n", encoding="utf-8-sig")
+
+    write(
+        PATIENTS_FILE,
+        "PatientID\tPatientGender\tPatientDateOfBirth\tPatientRace\tPatientMaritalStatus\tPatientLanguage\tPatientPopulationPercentageBelowPoverty",
+        [
+            "p1\tFemale\t1980-01-01\tWhite\tMarried\tEnglish\t12.5",
+            "p2\tMale\t1975-06-15\tAsian\tSingle\tEnglish\t3.2",
+        ],
+    )
+    write(
+        ADMISSIONS_FILE,
+        "PatientID\tAdmissionID\tAdmissionStartDate\tAdmissionEndDate",
+        [
+            "p1\t1\t2020-01-01 10:00:00\t2020-01-03 12:00:00",
+            "p1\t2\t2021-05-01 08:00:00\t2021-05-02 09:00:00",
+            "p2\t1\t2019-03-10 14:00:00\t2019-03-12 16:00:00",
+        ],
+    )
+    write(
+        DIAGNOSES_FILE,
+        "PatientID\tAdmissionID\tPrimaryDiagnosisCode\tPrimaryDiagnosisDescription",
+        [
+            "p1\t1\tM05.79\tRheumatoid arthritis",
+            "p2\t1\tI10\tEssential hypertension",
+        ],
+    )
+    write(
+        LABS_FILE,
+        "PatientID\tAdmissionID\tLabName\tLabValue\tLabUnits\tLabDateTime",
+        [
+            "p1\t1\tCBC: HEMOGLOBIN\t11.2\tg/dL\t2020-01-01 11:00:00",
+            "p1\t1\tESR\t42\tmm/hr\t2020-01-01 11:00:00",
+            "p1\t2\tCRP\tnot-a-number\tmg/dL\t2021-05-01 09:00:00",
+            "p2\t1\tMETABOLIC: GLUCOSE\t98\tmg/dL\t2019-03-10 15:00:00",
+        ],
+    )
+    return str(tmp_path)
+
+
+def test_load_patient_data_populates_store(sample_data_dir):
+    store = load_patient_data(sample_data_dir)
+    assert isinstance(store, PatientDataStore)
+    assert set(store.patients) == {"p1", "p2"}
+    assert store.patients["p1"].gender == "Female"
+    assert len(store.admissions["p1"]) == 2
+    assert len(store.admissions["p2"]) == 1
+
+
+def test_load_skips_non_numeric_lab_values(sample_data_dir):
+    store = load_patient_data(sample_data_dir)
+    # The non-numeric CRP row on p1 admission 2 must be dropped.
+    assert len(store.lab_results) == 3
+    assert "CRP" not in list(store.lab_results.names)
+
+
+def test_get_patient_data_shape(sample_data_dir):
+    store = load_patient_data(sample_data_dir)
+    data = store.get_patient_data("p1")
+    assert data is not None
+    assert data["patient"]["id"] == "p1"
+    assert data["patient"]["marital_status"] == "Married"
+    assert len(data["encounters"]) == 2
+    assert len(data["conditions"]) == 1
+    assert len(data["lab_results"]) == 2
+
+
+def test_csv_fallback_matches_pandas(sample_data_dir, monkeypatch):
+    from src.clinical_engine_prototype import loaders
+
+    monkeypatch.setattr(loaders, "pd", None)
+    store = load_patient_data(sample_data_dir)
+    assert set(store.patients) == {"p1", "p2"}
+    assert store.patients["p1"].poverty_percentage == pytest.approx(12.5)
+    assert len(store.lab_results) == 3  # non-numeric CRP row skipped on this path too
+
+
+def test_get_patient_data_unknown_patient(sample_data_dir):
+    store = load_patient_data(sample_data_dir)
+    assert store.get_patient_data("does-not-exist") is None